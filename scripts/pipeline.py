@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+pipeline.py
+
+Runs remove_types.py and keyword_screen.py as a single pass: the input .bib is
+read and split once, entries of excluded types or without a title are dropped,
+and the survivors are keyword-screened directly, without writing and re-reading
+the intermediate filtered_nodup.bib.
+
+Usage:
+    python3 pipeline.py non-duplicate.bib screened.bib included.csv excluded.csv
+
+Outputs are the same as those of keyword_screen.py run on the output of
+remove_types.py.
+"""
+
+import sys
+
+from remove_types import EXCLUDE_TYPES, report
+from keyword_screen import has_title, parallel_map, parse_entry, read_entries, screen_fields, write_outputs
+
+def process_one(e):
+    """
+    Filters and screens a single entry with one field scan: the parsed title
+    decides whether the entry is kept (see has_title for the fallback), and the
+    same fields are screened.
+    Returns (status, row), status being one of "kept", "removed_type",
+    "removed_notitle", "included" or "excluded".
+    """
+    (etype, key), fields = parse_entry(e)
+    if etype is None or key is None:
+        # keep non-standard text (comments, preamble)
+        return ("kept", None)
+    if etype in EXCLUDE_TYPES:
+        return ("removed_type", None)
+    if not has_title(e, fields):
+        return ("removed_notitle", None)
+
+    include, row = screen_fields(key, fields)
+    return ("included" if include else "excluded", row)
+
+def run_pipeline(input_path, out_bib, included_csv, excluded_csv):
+    entries = read_entries(input_path)
+    included_entries = []
+    included_rows = []
+    excluded_rows = []
+    removed_type = 0
+    removed_notitle = 0
+
+    for e, (status, row) in zip(entries, parallel_map(process_one, entries)):
+        if status == "removed_type":
+            removed_type += 1
+        elif status == "removed_notitle":
+            removed_notitle += 1
+        elif status == "excluded":
+            excluded_rows.append(row)
+        else:
+            included_entries.append(e)
+            if row is not None:
+                included_rows.append(row)
+
+    report(entries, removed_type, removed_notitle)
+    write_outputs(out_bib, included_csv, excluded_csv, included_entries, included_rows, excluded_rows)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5:
+        print("Usage: python3 pipeline.py input.bib screened.bib included.csv excluded.csv")
+        sys.exit(1)
+    run_pipeline(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4])
@@ -10,46 +10,22 @@ Usage:
 """
 
 import sys
-import re
 
-EXCLUDE_TYPES = {"book", "proceedings"}  # case-insensitive
-
-def split_entries(bibtext):
-    """
-    Splits a .bib text into individual entries.
-    Keeps comments or preamble text as separate blocks.
-    """
-    parts = re.split(r'(?=@\w+\s*\{)', bibtext, flags=re.MULTILINE)
-    return [p for p in parts if p.strip() != ""]
+from keyword_screen import has_title, parse_entry, read_entries
 
-def entry_type_and_key(entry):
-    """
-    Extracts the entry type and citation key.
-    Returns (type, key) or (None, None) if parsing fails.
-    """
-    m = re.match(r'\s*@\s*([^{(]+)\s*[{(]\s*([^,]+)\s*,', entry, flags=re.IGNORECASE)
-    if not m:
-        return (None, None)
-    return (m.group(1).strip().lower(), m.group(2).strip())
+EXCLUDE_TYPES = {"book", "proceedings"}  # case-insensitive
 
-def has_title_field(entry):
+def filter_entries(entries):
     """
-    Checks if the entry contains a title field.
+    Drops entries of EXCLUDE_TYPES and entries without a title.
+    Returns (kept, removed_type, removed_notitle).
     """
-    # Search for something like title = { ... } or title = "..."
-    return bool(re.search(r'\btitle\s*=\s*(\{[^}]+\}|"[^"]+")', entry, flags=re.IGNORECASE | re.S))
-
-def remove_types_and_missing_titles(input_path, output_path):
-    with open(input_path, 'r', encoding='utf-8') as f:
-        bibtext = f.read()
-
-    entries = split_entries(bibtext)
     kept = []
     removed_type = 0
     removed_notitle = 0
 
     for e in entries:
-        etype, key = entry_type_and_key(e)
+        (etype, key), fields = parse_entry(e)
         if etype is None:
             # keep non-standard text (comments, preamble)
             kept.append(e)
@@ -60,20 +36,29 @@ def remove_types_and_missing_titles(input_path, output_path):
             removed_type += 1
             continue
 
-        # check missing title
-        if not has_title_field(e):
+        # check missing (or empty) title
+        if not has_title(e, fields):
             removed_notitle += 1
             continue
 
         # keep valid entry
         kept.append(e)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("".join(kept))
+    return kept, removed_type, removed_notitle
 
+def report(entries, removed_type, removed_notitle):
     print(f"Processed {len(entries)} entries.")
     print(f"Removed {removed_type} entries of excluded types: {', '.join(EXCLUDE_TYPES)}")
     print(f"Removed {removed_notitle} entries without a title field.")
+
+def remove_types_and_missing_titles(input_path, output_path):
+    entries = read_entries(input_path)
+    kept, removed_type, removed_notitle = filter_entries(entries)
+
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(kept)
+
+    report(entries, removed_type, removed_notitle)
     print(f"Kept {len(kept)} entries. Written to {output_path}.")
 
 if __name__ == "__main__":
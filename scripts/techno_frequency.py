@@ -162,9 +162,11 @@ def main():
     with open(OUTPUT, "w", newline="", encoding="utf-8") as handle:
         w = csv.writer(handle)
         w.writerow(["group", "term", "n_raw", "pct_raw", "n_guarded", "pct_guarded", "inflation"])
+        rows = []
         for group, name, *_ in GROUPS:
             r, g = raw_counts.get(name, 0), guarded_counts.get(name, 0)
-            w.writerow([group, name, r, pct(r), g, pct(g), r - g])
+            rows.append([group, name, r, pct(r), g, pct(g), r - g])
+        w.writerows(rows)
         w.writerow([])
         w.writerow(["", "TOTAL ENTRIES", total, "100.00", total, "100.00", 0])
         w.writerow(["", "NO TECHNOLOGY TERM", no_tech_raw, pct(no_tech_raw),